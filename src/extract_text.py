@@ -1,104 +1,402 @@
-import fitz  # PyMuPDF
 from pathlib import Path
-import ebooklib
-from ebooklib import epub
-from bs4 import BeautifulSoup
+from typing import BinaryIO, Callable
+import codecs
+import io
 import logging  # logging をインポート
+import multiprocessing
+import os
+import warnings
 
 # モジュールレベルでロガーを取得
 logger = logging.getLogger(__name__)
 
+# PyMuPDF / EbookLib / BeautifulSoup は読み込みが重いため、テキスト抽出が
+# 必要になった時点で各関数内でインポートする (show や list などの起動を速くするため)
 
-def extract_text_from_pdf(path: Path) -> str | None:
+# PDFの並列抽出で1ワーカーあたりに割り当てる最小ページ数
+# spawn でのワーカー起動 (PyMuPDFのインポートを含む) には1プロセスあたり
+# 約0.3秒かかり、1ページの抽出は約1ミリ秒のため、ワーカーの起動コストを
+# 十分に上回る量のページを割り当てられる場合だけ並列化する
+PDF_PAGES_PER_WORKER = 500
+
+# 抽出したテキストをファイルへ書き出す際のバッファサイズ
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# 抽出結果の形式のバージョン (抽出結果のキャッシュの無効化に使う)
+# フラグやパーサーの変更など、抽出されるテキストが変わる変更をしたら上げること
+EXTRACTOR_VERSION = 3
+
+
+def _extract_pdf_page_range(path: Path, start: int, stop: int) -> list[str]:
     """
-    指定されたPDFファイルからテキストを抽出します。
+    PDFの指定範囲のページからテキストを抽出します (ワーカープロセス用)。
+
+    MuPDFのドキュメントはプロセス間で共有できないため、各ワーカーで
+    ファイルを開き直します。
+
+    Args:
+        path (Path): 読み込むPDFファイルのパス。
+        start (int): 抽出を開始するページ番号 (0始まり)。
+        stop (int): 抽出を終了するページ番号 (このページは含まない)。
+
+    Returns:
+        list[str]: 各ページのテキスト (ページ順)。
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return [doc[i].get_text("text") for i in range(start, stop)]
+
+
+def _extract_pdf_page_range_star(args: tuple[Path, int, int]) -> list[str]:
+    """
+    引数をタプルで受け取る _extract_pdf_page_range (Pool.imap 用)。
+
+    Args:
+        args (tuple[Path, int, int]): PDFのパス、開始ページ、終了ページ。
+
+    Returns:
+        list[str]: 各ページのテキスト (ページ順)。
+    """
+    return _extract_pdf_page_range(*args)
+
+
+def _write_pdf_parallel(
+    path: Path, page_count: int, processes: int, out: BinaryIO
+) -> None:
+    """
+    PDFのページを複数プロセスに分割してテキストを抽出し、書き出します。
+
+    Args:
+        path (Path): 読み込むPDFファイルのパス。
+        page_count (int): PDFの総ページ数。
+        processes (int): 使用するワーカープロセス数。
+        out (BinaryIO): UTF-8のテキストを書き込む出力先。
+
+    Returns:
+        None
+    """
+    step = -(-page_count // processes)  # 切り上げ除算
+    ranges = [
+        (path, start, min(start + step, page_count))
+        for start in range(0, page_count, step)
+    ]
+    # MuPDFはforkに対して安全ではなく、呼び出し元がスレッドを使っている場合も
+    # あるため、ワーカーは spawn で新しく起動する
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=len(ranges)) as pool:
+        # 全範囲の完了を待たずに、終わった範囲からページ順に書き出す
+        for chunks in pool.imap(_extract_pdf_page_range_star, ranges):
+            for chunk in chunks:
+                out.write(chunk.encode("utf-8"))
+
+
+def extract_text_from_pdf_to(path: Path, out: BinaryIO) -> bool:
+    """
+    指定されたPDFファイルからテキストを抽出し、ページごとに書き出します。
 
     PyMuPDFライブラリを使用して、PDFファイルの各ページからテキストコンテンツを
-    取り出します。抽出中にエラーが発生した場合は、標準エラーに英語で
-    エラーメッセージを出力し、Noneを返します。
+    取り出し、UTF-8で out に書き込みます。ページ数が多く、1ワーカーあたり
+    PDF_PAGES_PER_WORKER ページ以上を割り当てて2プロセス以上使える場合は、
+    CPUコア数を上限としたプロセスでページを分担して抽出します。
+    抽出中にエラーが発生した場合は、標準エラーに英語でエラーメッセージを
+    出力し、Falseを返します。
 
     Args:
         path (Path): 読み込むPDFファイルのパス。
+        out (BinaryIO): UTF-8のテキストを書き込む出力先。
 
     Returns:
-        str | None: 抽出されたテキスト全体。エラーが発生した場合はNone。
+        bool: 抽出に成功した場合はTrue。エラーが発生した場合はFalse。
     """
-    text = ""
+    import fitz  # PyMuPDF
+
     try:
         with fitz.open(path) as doc:
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text += page.get_text("text")
-        return text
+            page_count = len(doc)
+            processes = min(os.cpu_count() or 1, page_count // PDF_PAGES_PER_WORKER)
+            if processes < 2:
+                for page in doc:
+                    out.write(page.get_text("text").encode("utf-8"))
+                return True
+        _write_pdf_parallel(path, page_count, processes, out)
+        return True
+    except (FileNotFoundError, fitz.FileNotFoundError):
+        # 想定内のエラーのため、スタックトレースは出力しない
+        logger.error(f"Error: File not found: {path}")
+        return False
     except Exception as e:
         # print の代わりに logger.error を使用
         # exc_info=True で例外情報（スタックトレース）もログに出力
         logger.error(
             f"Error occurred while processing PDF '{path}': {e}", exc_info=True
         )
-        return None
+        return False
 
 
-def extract_text_from_epub(path: Path) -> str | None:
+def _html_body_to_text_selectolax(content: bytes) -> str:
     """
-    指定されたEPUBファイルからプレーンテキストを抽出します。
+    selectolax (Lexbor) を使ってHTMLの <body> からテキストを取り出します。
+
+    Args:
+        content (bytes): HTML (XHTML) のバイト列。
+
+    Returns:
+        str: <body> 内のテキスト。<body> がない場合は空文字列。
+    """
+    from selectolax.lexbor import LexborHTMLParser
+
+    body = LexborHTMLParser(content).body
+    return body.text() if body is not None else ""
 
-    EbookLibライブラリでEPUBファイルを読み込み、BeautifulSoupライブラリを
-    使用して各ドキュメント（主にXHTML）からHTMLタグを除去し、テキストのみを
-    抽出します。抽出中にエラーが発生した場合は、標準エラーに英語で
-    エラーメッセージを出力し、Noneを返します。
+
+def _html_body_to_text_bs4(content: bytes) -> str:
+    """
+    BeautifulSoup (lxmlパーサー) を使ってHTMLの <body> からテキストを取り出します。
+
+    Args:
+        content (bytes): HTML (XHTML) のバイト列。
+
+    Returns:
+        str: <body> 内のテキスト。
+    """
+    from bs4 import BeautifulSoup, SoupStrainer, XMLParsedAsHTMLWarning
+
+    # EPUBのXHTMLはHTMLとしてパースすれば十分なため、lxmlパーサーの警告は抑制する
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", XMLParsedAsHTMLWarning)
+        # C実装のlxmlパーサーにバイト列を直接渡し、デコードもlibxml2側で行う
+        # <head> (タイトルやCSS) は不要なため、<body> の中だけをパースする
+        soup = BeautifulSoup(
+            content, "lxml", from_encoding="utf-8", parse_only=SoupStrainer("body")
+        )
+    text = soup.get_text()
+    # パースツリーはすぐに破棄し、メモリ使用量を抑える
+    soup.decompose()
+    return text
+
+
+def _get_html_to_text() -> Callable[[bytes], str]:
+    """
+    HTMLからテキストを取り出す関数を返します。
+
+    selectolax がインストールされていればそれを使い (オプション)、
+    なければ BeautifulSoup + lxml を使います。
+
+    Returns:
+        Callable[[bytes], str]: HTMLのバイト列を受け取りテキストを返す関数。
+    """
+    try:
+        import selectolax.lexbor  # noqa: F401
+    except ImportError:
+        return _html_body_to_text_bs4
+    return _html_body_to_text_selectolax
+
+
+def extract_text_from_epub_to(path: Path, out: BinaryIO) -> bool:
+    """
+    指定されたEPUBファイルからプレーンテキストを抽出し、ドキュメントごとに書き出します。
+
+    EbookLibライブラリでEPUBファイルを読み込み、各ドキュメント（主にXHTML）の
+    <body> からHTMLタグを除去し、テキストのみをUTF-8で out に書き込みます。
+    HTMLのパースには selectolax があればそれを、なければ BeautifulSoup
+    (lxmlパーサー) を使用します。抽出中にエラーが発生した場合は、標準エラーに
+    英語でエラーメッセージを出力し、Falseを返します。
 
     Args:
         path (Path): 読み込むEPUBファイルのパス。
+        out (BinaryIO): UTF-8のテキストを書き込む出力先。
 
     Returns:
-        str | None: 抽出されたテキスト全体。エラーが発生した場合はNone。
+        bool: 抽出に成功した場合はTrue。エラーが発生した場合はFalse。
     """
-    full_text = ""
+    import ebooklib
+    from ebooklib import epub
+
+    html_to_text = _get_html_to_text()
     try:
         book = epub.read_epub(path, options={"ignore_ncx": True})
         items = book.get_items_of_type(ebooklib.ITEM_DOCUMENT)
 
         for item in items:
-            content_bytes = item.get_content()
-            html_content = content_bytes.decode("utf-8", errors="ignore")
-            soup = BeautifulSoup(html_content, "html.parser")
-            text = soup.get_text()
-            full_text += text + ""
-        return full_text
+            out.write(html_to_text(item.get_content()).encode("utf-8"))
+        return True
 
     except (
         FileNotFoundError
     ):  # FileNotFoundError も Exception の一種だが、個別でログメッセージを変えても良い
-        # print の代わりに logger.error を使用
-        logger.error(
-            f"Error: File not found: {path}", exc_info=True
-        )  # FileNotFoundError では通常スタックトレースは不要かもしれないが、付けておいても問題ない
-        return None
+        # 想定内のエラーのため、スタックトレースは出力しない
+        logger.error(f"Error: File not found: {path}")
+        return False
     except (
         epub.EpubException
     ) as e:  # ebooklib.epub.EpubException から epub.EpubException に変更
-        # print の代わりに logger.error を使用
-        logger.error(f"Error: Failed to read EPUB file ({path}): {e}", exc_info=True)
-        return None
+        # 壊れたEPUBなど想定内のエラーのため、スタックトレースは出力しない
+        logger.error(f"Error: Failed to read EPUB file ({path}): {e}")
+        return False
     except Exception as e:
         # print の代わりに logger.error を使用
         logger.error(
             f"An unexpected error occurred while processing EPUB '{path}': {e}",
             exc_info=True,
         )
+        return False
+
+
+def extract_text_from_txt_to(path: Path, out: BinaryIO) -> bool:
+    """
+    指定されたテキストファイル (UTF-8) の内容をそのまま書き出します。
+
+    デコードはせずにバイト列のまま書き出しますが、UTF-8として正しいかどうかは
+    読み込みながら検証し、不正なバイト列を含む場合は英語でエラーメッセージを
+    出力してFalseを返します。
+
+    Args:
+        path (Path): 読み込むテキストファイルのパス。
+        out (BinaryIO): テキストを書き込む出力先。
+
+    Returns:
+        bool: 書き出しに成功した場合はTrue。ファイルが存在しない場合や
+            UTF-8として読めない場合はFalse。
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(OUTPUT_BUFFER_SIZE):
+                decoder.decode(chunk)
+                out.write(chunk)
+        decoder.decode(b"", final=True)
+        return True
+    except FileNotFoundError:
+        # 想定内のエラーのため、スタックトレースは出力しない
+        logger.error(f"Error: File not found: {path}")
+        return False
+    except UnicodeDecodeError as e:
+        # 想定内のエラーのため、スタックトレースは出力しない
+        logger.error(f"Error: File is not valid UTF-8 text: {path}: {e}")
+        return False
+
+
+def _extract_to_str(
+    extractor: Callable[[Path, BinaryIO], bool], path: Path
+) -> str | None:
+    """
+    ストリーミング版の抽出関数をメモリ上のバッファに対して呼び出し、文字列で返します。
+
+    Args:
+        extractor (Callable[[Path, BinaryIO], bool]): ストリーミング版の抽出関数。
+        path (Path): 読み込むファイルのパス。
+
+    Returns:
+        str | None: 抽出されたテキスト全体。エラーが発生した場合はNone。
+    """
+    buf = io.BytesIO()
+    if not extractor(path, buf):
+        return None
+    return buf.getvalue().decode("utf-8")
+
+
+def extract_text_from_pdf(path: Path) -> str | None:
+    """
+    指定されたPDFファイルからテキストを抽出します。
+
+    extract_text_from_pdf_to の結果を文字列として返します。
+
+    Args:
+        path (Path): 読み込むPDFファイルのパス。
+
+    Returns:
+        str | None: 抽出されたテキスト全体。エラーが発生した場合はNone。
+    """
+    return _extract_to_str(extract_text_from_pdf_to, path)
+
+
+def extract_text_from_epub(path: Path) -> str | None:
+    """
+    指定されたEPUBファイルからプレーンテキストを抽出します。
+
+    extract_text_from_epub_to の結果を文字列として返します。
+
+    Args:
+        path (Path): 読み込むEPUBファイルのパス。
+
+    Returns:
+        str | None: 抽出されたテキスト全体。エラーが発生した場合はNone。
+    """
+    return _extract_to_str(extract_text_from_epub_to, path)
+
+
+# 拡張子 (小文字) と対応するストリーミング版テキスト抽出関数の対応表
+_EXTRACTORS: dict[str, Callable[[Path, BinaryIO], bool]] = {
+    ".pdf": extract_text_from_pdf_to,
+    ".epub": extract_text_from_epub_to,
+    ".txt": extract_text_from_txt_to,
+}
+
+
+def _get_extractor(path: Path) -> Callable[[Path, BinaryIO], bool] | None:
+    """
+    ファイルの拡張子 (大文字小文字を区別しない) に対応する抽出関数を返します。
+
+    サポートされていないファイルタイプの場合は警告をログに出力し、Noneを返します。
+
+    Args:
+        path (Path): 読み込むファイルのパス。
+
+    Returns:
+        Callable[[Path, BinaryIO], bool] | None: 抽出関数。
+                                                サポートされていない場合はNone。
+    """
+    suffix = path.suffix.lower()
+    extractor = _EXTRACTORS.get(suffix)
+    if extractor is None:
+        logger.warning(
+            f"Unsupported file type: '{path.suffix}' for file '{path}'. Only {', '.join(_EXTRACTORS)} are supported."
+        )
         return None
 
+    # ログが無効な場合はメッセージの組み立て自体を省く
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"Processing {suffix[1:].upper()} file: {path}")
+    return extractor
+
+
+def extract_text_to(path: Path, out_path: Path) -> bool:
+    """
+    指定されたファイルからテキストを抽出し、out_path にUTF-8で書き出します。
+
+    抽出結果を文字列としてメモリ上に組み立てず、ページやドキュメントごとに
+    直接ファイルへ書き込みます。サポートされていないファイルタイプの場合、
+    抽出中にエラーが発生した場合、または抽出されたテキストが空の場合は
+    out_path を残さずにFalseを返します。
+
+    Args:
+        path (Path): 読み込むファイルのパス。
+        out_path (Path): 抽出したテキストの書き出し先。
+
+    Returns:
+        bool: テキストを書き出した場合はTrue。それ以外はFalse。
+    """
+    extractor = _get_extractor(path)
+    if extractor is None:
+        return False
+
+    with open(out_path, "wb", buffering=OUTPUT_BUFFER_SIZE) as out:
+        ok = extractor(path, out)
+        written = out.tell() > 0
+    if not (ok and written):
+        out_path.unlink(missing_ok=True)
+        return False
+    return True
+
 
-# パターンマッチ構文を使用した extract_text 関数
 def extract_text(path: Path) -> str | None:
     """
-    指定されたファイルの拡張子に基づいて適切なテキスト抽出関数を呼び出します。(パターンマッチ使用)
+    指定されたファイルの拡張子に基づいて適切なテキスト抽出関数を呼び出します。
 
-    ファイルの拡張子が '.pdf' または '.epub' (大文字小文字を区別しない) の場合、
-    対応する抽出関数 (`extract_text_from_pdf` または `extract_text_from_epub`)
-    を呼び出します。サポートされていないファイルタイプの場合は警告をログに出力し、
-    Noneを返します。
+    ファイルの拡張子 (大文字小文字を区別しない) で _EXTRACTORS から対応する
+    抽出関数を引き、結果を文字列として返します。サポートされていない
+    ファイルタイプの場合は警告をログに出力し、Noneを返します。
 
     Args:
         path (Path): 読み込むファイルのパス。
@@ -108,22 +406,7 @@ def extract_text(path: Path) -> str | None:
                     サポートされていないファイルタイプ、または抽出中にエラーが
                     発生した場合はNone。
     """
-    # ファイルの拡張子を小文字で取得
-    suffix = path.suffix.lower()
-
-    # match-case で拡張子に基づいて処理を分岐
-    match suffix:
-        case ".pdf":
-            logger.info(f"Processing PDF file: {path}")
-            return extract_text_from_pdf(path)
-        case ".epub":
-            logger.info(f"Processing EPUB file: {path}")
-            return extract_text_from_epub(path)
-        case ".txt":
-            logger.info(f"Processing TXT file: {path}")
-            return path.read_text()
-        case _:  # ワイルドカードパターン: 上記のcaseに一致しない場合
-            logger.warning(
-                f"Unsupported file type: '{path.suffix}' for file '{path}'. Only .pdf and .epub are supported."
-            )
-            return None
+    extractor = _get_extractor(path)
+    if extractor is None:
+        return None
+    return _extract_to_str(extractor, path)
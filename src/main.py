@@ -1,16 +1,36 @@
 #!/usr/bin/env python3
-import argparse
+import contextlib
 import csv
+import hashlib
 import json
 import logging
+import multiprocessing
 import os
 import shutil
 import sys
+import types
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Optional
 
-from extract_text import extract_text
+from extract_text import EXTRACTOR_VERSION, extract_text_to
+
+if TYPE_CHECKING:
+    # argparse は読み込みに時間がかかるため、高速パスで扱えない場合だけ読み込む
+    import argparse
+
+try:
+    # reflink (FICLONE) はLinuxでのみ使用する
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore[assignment]
+
+try:
+    # orjson がインストールされていれば高速なJSON処理に使う (オプション)
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
 
 # ロギングの設定
 logging.basicConfig(
@@ -30,6 +50,30 @@ else:
     EXEC_PATH = Path(os.path.dirname(os.path.abspath(__file__)))
 
 SHELF_DIR = EXEC_PATH / "shelf_data"
+# 各コマンドの位置引数とオプション (setup_subparsers の定義と一致させること)
+COMMAND_SPECS: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    "add": (("file", "id", "title"), ("--memo",)),
+    "show": (("id",), ()),
+    "edit": (("id",), ("--title", "--memo")),
+    "delete": (("id",), ()),
+    "list": ((), ()),
+    "info": (("id",), ()),
+}
+
+# 抽出済みテキストのキャッシュ (ファイル内容のハッシュをキーとする)
+CACHE_DIR = SHELF_DIR / ".cache"
+# 本のディレクトリ内で、キャッシュのキー (ハッシュ) を記録するファイルの名前
+# (ユーザー向けのメタデータには含めない)
+DIGEST_FILE_NAME = ".digest"
+# キャッシュのキーに使うハッシュのサイズ (バイト数)
+DIGEST_SIZE = 16
+# ハッシュ計算時の読み込みバッファサイズ
+HASH_BUFFER_SIZE = 1 << 20
+# 抽出済みテキストを標準出力へ書き出す際に一度に読み込む文字数
+TEXT_READ_BUFFER_SIZE = 128 * 1024
+# 抽出結果に影響するライブラリ (バージョンが変わったらキャッシュを無効にする)
+# selectolax はインストールの有無で EPUB のパーサーが変わるため含めている
+EXTRACTOR_PACKAGES = ("pymupdf", "ebooklib", "beautifulsoup4", "lxml", "selectolax")
 
 
 def setup_shelf() -> None:
@@ -44,12 +88,270 @@ def setup_shelf() -> None:
         logger.info(f"シェルフディレクトリを作成しました: {SHELF_DIR}")
 
 
+def temporary_path(path: Path) -> Path:
+    """
+    path をアトミックに置き換えるための一時ファイルのパスを返します。
+
+    同じディレクトリ内に作るため、os.replace で置き換えることができます。
+
+    Args:
+        path (Path): 最終的なファイルのパス
+
+    Returns:
+        Path: 一時ファイルのパス
+    """
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+
+def load_json(path: Path) -> dict[str, Any]:
+    """
+    JSONファイルを読み込みます。
+
+    orjson が利用可能な場合はそれを使い、なければ標準の json を使います。
+
+    Args:
+        path (Path): 読み込むJSONファイルのパス
+
+    Returns:
+        dict[str, Any]: 読み込んだデータ
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_json(path: Path, data: dict[str, Any]) -> None:
+    """
+    データをJSONファイルに書き込みます。
+
+    orjson が利用可能な場合はそれを使い、なければ標準の json を使います。
+    どちらの場合もインデントなしのコンパクトなUTF-8として一度に書き込みます
+    (整形表示は handle_info で行います)。
+
+    Args:
+        path (Path): 書き込むJSONファイルのパス
+        data (dict[str, Any]): 書き込むデータ
+
+    Returns:
+        None
+    """
+    if orjson is not None:
+        payload = orjson.dumps(data)
+    else:
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+    # 書き込み途中で中断されても壊れたファイルが残らないよう、一時ファイル経由で置き換える
+    tmp_path = temporary_path(path)
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def file_digest(path: Path) -> str:
+    """
+    ファイル内容のBLAKE2bハッシュを計算します。
+
+    再利用するバッファに readinto で読み込むことで、チャンクごとの
+    メモリ確保を避けます。
+
+    Args:
+        path (Path): ハッシュを計算するファイルのパス
+
+    Returns:
+        str: 16進数文字列のハッシュ値
+    """
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    view = memoryview(bytearray(HASH_BUFFER_SIZE))
+    # 自前のバッファに直接読み込むため、ファイル側のバッファリングは無効にする
+    with open(path, "rb", buffering=0) as f:
+        while n := f.readinto(view):
+            hasher.update(view[:n])
+    return hasher.hexdigest()
+
+
+def extractor_versions() -> dict[str, str]:
+    """
+    テキスト抽出に使用するライブラリのバージョンを取得します。
+
+    Returns:
+        dict[str, str]: パッケージ名とバージョンの辞書
+    """
+    # 起動時間短縮のため、必要になるまでインポートしない
+    import importlib.metadata
+
+    versions: dict[str, str] = {}
+    for name in EXTRACTOR_PACKAGES:
+        try:
+            versions[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            versions[name] = "unknown"
+    return versions
+
+
+def copy_book_file(src: Path, dst: Path) -> None:
+    """
+    本のファイルを本棚へコピーします。
+
+    reflink (btrfs や XFS などのコピーオンライト対応ファイルシステム) を試し、
+    使えない場合は通常のコピー (shutil.copy2) を行います。
+    ハードリンクは本棚側への書き込みが元のファイルにも反映されてしまうため使いません。
+
+    Args:
+        src (Path): コピー元のファイルパス
+        dst (Path): コピー先のファイルパス
+
+    Returns:
+        None
+    """
+    ficlone = getattr(fcntl, "FICLONE", None)
+    if fcntl is not None and ficlone is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), ficlone, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            # reflink 非対応のファイルシステムなど
+            dst.unlink(missing_ok=True)
+
+    shutil.copy2(src, dst)
+
+
+def book_copy_path(book_path: Path, book_dir: Path, reserved: tuple[Path, ...]) -> Path:
+    """
+    本棚へコピーする本のファイルのパスを決めます。
+
+    元のファイル名が抽出済みテキストやメタデータなど本棚側のファイル名と重なる場合
+    (例: notes.txt を ID "notes" で追加する場合) は、同じファイルへ同時に
+    書き込まないよう "<名前>.original<拡張子>" という名前にします。
+
+    Args:
+        book_path (Path): 追加する本のファイルパス
+        book_dir (Path): 本のディレクトリ
+        reserved (tuple[Path, ...]): 本のディレクトリ内で使用済みのファイルパス
+
+    Returns:
+        Path: コピー先のファイルパス
+    """
+    # 大文字小文字を区別しないファイルシステムでも衝突しないよう casefold で比較する
+    reserved_names = {path.name.casefold() for path in reserved}
+    if book_path.name.casefold() not in reserved_names:
+        return book_dir / book_path.name
+    return book_dir / f"{book_path.stem}.original{book_path.suffix}"
+
+
+def load_cached_text(digest: str, cache_meta: dict[str, Any], text_file: Path) -> bool:
+    """
+    キャッシュされた抽出済みテキストを text_file へコピーします。
+
+    キャッシュが存在しない場合、抽出条件 (cache_meta) が一致しない場合、
+    キャッシュが壊れていて読み込めない場合はキャッシュミスとして扱います。
+
+    Args:
+        digest (str): 本のファイル内容のハッシュ
+        cache_meta (dict[str, Any]): 現在の抽出条件 (拡張子やライブラリのバージョン)
+        text_file (Path): テキストのコピー先
+
+    Returns:
+        bool: キャッシュを使用した場合はTrue。キャッシュミスの場合はFalse。
+    """
+    cached_text = CACHE_DIR / f"{digest}.txt"
+    try:
+        if load_json(CACHE_DIR / f"{digest}.json") != cache_meta:
+            return False
+        shutil.copy(cached_text, text_file)
+    except (OSError, ValueError) as e:
+        # キャッシュがない、または壊れている (JSONDecodeError は ValueError の一種)
+        logger.debug(f"キャッシュを使用できません ({digest}): {e}")
+        return False
+    logger.info(f"キャッシュされたテキストを使用します: {cached_text}")
+    return True
+
+
+def store_cached_text(digest: str, cache_meta: dict[str, Any], text_file: Path) -> None:
+    """
+    抽出済みテキストをキャッシュに保存します。
+
+    テキスト、抽出条件の順に一時ファイル経由で置き換えるため、
+    途中で中断されても不完全なキャッシュが使われることはありません。
+    キャッシュは高速化のためだけのものなので、書き込みに失敗しても
+    警告をログに記録するだけで、本の追加は続行します。
+
+    Args:
+        digest (str): 本のファイル内容のハッシュ
+        cache_meta (dict[str, Any]): 抽出条件 (拡張子やライブラリのバージョン)
+        text_file (Path): キャッシュする抽出済みテキスト
+
+    Returns:
+        None
+    """
+    cached_text = CACHE_DIR / f"{digest}.txt"
+    tmp_path = temporary_path(cached_text)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        shutil.copy(text_file, tmp_path)
+        os.replace(tmp_path, cached_text)
+        dump_json(CACHE_DIR / f"{digest}.json", cache_meta)
+    except OSError as e:
+        # ディスク容量不足や権限不足など。書きかけの一時ファイルは残さない
+        logger.warning(f"テキストをキャッシュに保存できませんでした ({digest}): {e}")
+        with contextlib.suppress(OSError):
+            tmp_path.unlink()
+
+
+def remove_cached_text(digest: str) -> None:
+    """
+    抽出済みテキストのキャッシュを削除します。
+
+    Args:
+        digest (str): 本のファイル内容のハッシュ
+
+    Returns:
+        None
+    """
+    (CACHE_DIR / f"{digest}.json").unlink(missing_ok=True)
+    (CACHE_DIR / f"{digest}.txt").unlink(missing_ok=True)
+
+
+def save_text(book_path: Path, text_file: Path) -> str:
+    """
+    本のファイルからテキストを抽出して保存します。
+
+    抽出したテキストはファイル内容のハッシュをキーに CACHE_DIR へキャッシュされ、
+    同じ内容のファイルを再度追加した場合は抽出を省略します。キャッシュは
+    拡張子、抽出処理のバージョン (EXTRACTOR_VERSION)、抽出に使うライブラリの
+    バージョンのいずれかが変わると無効になります。
+
+    Args:
+        book_path (Path): テキストを抽出する本のファイルパス
+        text_file (Path): 抽出したテキストの保存先
+
+    Returns:
+        str: 本のファイル内容のハッシュ
+    """
+    digest = file_digest(book_path)
+    cache_meta = {
+        "suffix": book_path.suffix.lower(),
+        "extractor_version": EXTRACTOR_VERSION,
+        "versions": extractor_versions(),
+    }
+    if not load_cached_text(digest, cache_meta, text_file) and extract_text_to(
+        book_path, text_file
+    ):
+        store_cached_text(digest, cache_meta, text_file)
+    return digest
+
+
 def handle_add(file_path: str, book_id: str, title: str, memo: str = "") -> None:
     """
     新しい本を追加します。
 
     指定されたファイルパスから本をシステムに追加し、メタデータを保存します。
     テキストを抽出して保存し、元のファイルもコピーします。
+    コピーとテキスト抽出はスレッドプールで並行して実行されます。
 
     Args:
         file_path (str): 追加する本のファイルパス
@@ -65,6 +367,10 @@ def handle_add(file_path: str, book_id: str, title: str, memo: str = "") -> None
         logger.error(f"ファイルが見つかりません: {book_path}")
         sys.exit(1)
 
+    if book_id == CACHE_DIR.name:
+        logger.error(f"ID '{book_id}' は予約されているため使用できません。")
+        sys.exit(1)
+
     # 本のディレクトリを作成
     book_dir = SHELF_DIR / book_id
     if book_dir.exists():
@@ -72,28 +378,37 @@ def handle_add(file_path: str, book_id: str, title: str, memo: str = "") -> None
         sys.exit(1)
     book_dir.mkdir(exist_ok=True)
 
-    # 本のファイルをコピー
-    dest_file = book_dir / book_path.name
-    shutil.copy2(book_path, dest_file)
-
-    # テキストを抽出して保存
-    text = extract_text(book_path)
-    if text:
+    try:
+        # 本のファイルのコピーとテキストの抽出は互いに独立しているため並行して実行する
         text_file = book_dir / f"{book_id}.txt"
-        text_file.write_text(text)
-
-    # メタデータをJSONで保存
-    now = datetime.now().isoformat()
-    metadata: dict[str, str] = {
-        "id": book_id,
-        "title": title,
-        "memo": memo,
-        "created_at": now,
-        "updated_at": now,
-    }
-    json_file = book_dir / f"{book_id}.json"
-    with open(json_file, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, ensure_ascii=False, indent=4)
+        json_file = book_dir / f"{book_id}.json"
+        digest_file = book_dir / DIGEST_FILE_NAME
+        dest_file = book_copy_path(
+            book_path, book_dir, (text_file, json_file, digest_file)
+        )
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            copy_future = executor.submit(copy_book_file, book_path, dest_file)
+            text_future = executor.submit(save_text, book_path, text_file)
+            copy_future.result()
+            digest = text_future.result()
+
+        # 削除時に抽出済みテキストのキャッシュを消せるよう、ハッシュを記録しておく
+        digest_file.write_text(digest, encoding="utf-8")
+
+        # メタデータをJSONで保存
+        now = datetime.now().isoformat()
+        metadata: dict[str, str] = {
+            "id": book_id,
+            "title": title,
+            "memo": memo,
+            "created_at": now,
+            "updated_at": now,
+        }
+        dump_json(json_file, metadata)
+    except BaseException:
+        # 作りかけのディレクトリが残ると同じIDで追加し直せなくなるため削除する
+        shutil.rmtree(book_dir, ignore_errors=True)
+        raise
 
     logger.info(f"本 '{book_id}' を追加しました。")
 
@@ -121,7 +436,11 @@ def handle_show(book_id: str) -> None:
         logger.error(f"テキストファイルが見つかりません: {text_file}")
         sys.exit(1)
 
-    print(text_file.read_text())
+    # 本全体を1つの文字列として読み込まず、TEXT_READ_BUFFER_SIZE ずつ標準出力へ書き出す
+    with open(text_file, encoding="utf-8") as f:
+        shutil.copyfileobj(f, sys.stdout, TEXT_READ_BUFFER_SIZE)
+    # print で出力していた頃と同じく、末尾に改行を付ける
+    sys.stdout.write("\n")
 
 
 def handle_edit(
@@ -152,8 +471,7 @@ def handle_edit(
         sys.exit(1)
 
     # 現在のメタデータを読み込む
-    with open(json_file, encoding="utf-8") as f:
-        metadata: dict[str, str] = json.load(f)
+    metadata: dict[str, str] = load_json(json_file)
 
     # 更新するフィールドを処理
     if title:
@@ -165,8 +483,7 @@ def handle_edit(
     metadata["updated_at"] = datetime.now().isoformat()
 
     # 更新したメタデータを保存
-    with open(json_file, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, ensure_ascii=False, indent=4)
+    dump_json(json_file, metadata)
 
     logger.info(f"本 '{book_id}' のメタデータを更新しました。")
 
@@ -177,6 +494,7 @@ def handle_delete(book_id: str) -> None:
 
     指定されたIDの本をシステムから完全に削除します。
     本のファイル、テキスト、メタデータなど、すべてのデータが削除されます。
+    抽出済みテキストのキャッシュも削除されます。
 
     Args:
         book_id (str): 削除する本のID
@@ -186,40 +504,72 @@ def handle_delete(book_id: str) -> None:
     """
     book_dir = SHELF_DIR / book_id
 
-    if not book_dir.exists():
+    if book_id == CACHE_DIR.name or not book_dir.exists():
         logger.error(f"ID '{book_id}' の本が見つかりません。")
         sys.exit(1)
 
+    # 抽出済みテキストのキャッシュも一緒に削除する
+    try:
+        digest = (book_dir / DIGEST_FILE_NAME).read_text(encoding="utf-8").strip()
+    except OSError:
+        digest = None
+
     shutil.rmtree(book_dir)
+    # 手で書き換えられていてもキャッシュディレクトリの外を消さないよう、形式を確認する
+    if digest and len(digest) == DIGEST_SIZE * 2 and digest.isalnum():
+        remove_cached_text(digest)
     logger.info(f"本 '{book_id}' を削除しました。")
 
 
+def load_book_metadata(json_file: Path) -> dict[str, str] | None:
+    """
+    本のメタデータファイルを読み込みます。
+
+    事前に存在を確認せずに開き、存在しない場合は FileNotFoundError で判定します。
+
+    Args:
+        json_file (Path): メタデータファイルのパス
+
+    Returns:
+        dict[str, str] | None: メタデータ。ファイルが存在しない場合はNone。
+    """
+    try:
+        return load_json(json_file)
+    except FileNotFoundError:
+        return None
+
+
 def handle_list() -> None:
     """
     すべての本をリスト表示します。
 
     システムに登録されているすべての本のメタデータをCSV形式で標準出力に表示します。
     本が登録されていない場合はその旨をログに記録します。
+    メタデータファイルはスレッドプールで並行して読み込みます。
 
     Returns:
         None
     """
-    if not SHELF_DIR.exists() or not any(SHELF_DIR.iterdir()):
+    # os.scandir はエントリの種類を一緒に返すため、ディレクトリ判定で stat が不要になる
+    # (メタデータファイルの有無は読み込み時に FileNotFoundError で判定する)
+    try:
+        with os.scandir(SHELF_DIR) as entries:
+            json_files = [
+                Path(entry.path) / f"{entry.name}.json"
+                for entry in entries
+                if entry.is_dir(follow_symlinks=False) and entry.name != CACHE_DIR.name
+            ]
+    except FileNotFoundError:
+        json_files = []
+
+    if not json_files:
         logger.info("本棚は空です。")
         return
 
-    books: list[dict[str, str]] = []
-    for book_dir in SHELF_DIR.iterdir():
-        if not book_dir.is_dir():
-            continue
-
-        json_file = book_dir / f"{book_dir.name}.json"
-        if not json_file.exists():
-            continue
-
-        with open(json_file, encoding="utf-8") as f:
-            metadata = json.load(f)
-            books.append(metadata)
+    # ファイルごとの読み込みはI/O待ちが中心のため、スレッドプールで並行して行う
+    with ThreadPoolExecutor(max_workers=min(32, len(json_files))) as executor:
+        results = executor.map(load_book_metadata, json_files)
+        books = [metadata for metadata in results if metadata is not None]
 
     # CSVとして出力
     writer = csv.DictWriter(
@@ -253,14 +603,15 @@ def handle_info(book_id: str) -> None:
         sys.exit(1)
 
     # メタデータを読み込む
-    with open(json_file, encoding="utf-8") as f:
-        metadata = json.load(f)
+    metadata = load_json(json_file)
 
     # 整形されたJSONを標準出力に表示
     print(json.dumps(metadata, ensure_ascii=False, indent=4))
 
 
-def setup_subparsers(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+def setup_subparsers(
+    parser: "argparse.ArgumentParser",
+) -> "argparse.ArgumentParser":
     """
     コマンドライン引数のサブパーサーを設定します。
 
@@ -312,6 +663,56 @@ def setup_subparsers(parser: argparse.ArgumentParser) -> argparse.ArgumentParser
     return parser
 
 
+def parse_args_fast(argv: list[str]) -> Optional[types.SimpleNamespace]:
+    """
+    コマンドライン引数を argparse を使わずに解析します。
+
+    COMMAND_SPECS に定義された形の引数だけを扱い、setup_subparsers で
+    構築したパーサーと同じ属性を持つ SimpleNamespace を返します。ヘルプ表示、未知の
+    オプション、引数の過不足など、それ以外の場合は None を返すので、
+    呼び出し側で argparse による解析 (とエラー表示) を行ってください。
+
+    Args:
+        argv (list[str]): コマンドライン引数 (プログラム名を除く)
+
+    Returns:
+        Optional[types.SimpleNamespace]: 解析結果。扱えない引数の場合は None。
+    """
+    if not argv or argv[0] not in COMMAND_SPECS:
+        return None
+
+    command = argv[0]
+    positional_names, option_names = COMMAND_SPECS[command]
+    positionals: list[str] = []
+    options: dict[str, Optional[str]] = {name: None for name in option_names}
+
+    rest = iter(argv[1:])
+    for arg in rest:
+        if not arg.startswith("-"):
+            positionals.append(arg)
+            continue
+
+        name, sep, value = arg.partition("=")
+        if name not in options:
+            return None
+        if not sep:
+            next_arg = next(rest, None)
+            if next_arg is None or next_arg.startswith("-"):
+                return None
+            value = next_arg
+        options[name] = value
+
+    if len(positionals) != len(positional_names):
+        return None
+
+    return types.SimpleNamespace(
+        command=command,
+        func=command,
+        **dict(zip(positional_names, positionals)),
+        **{name.removeprefix("--"): value for name, value in options.items()},
+    )
+
+
 def main() -> None:
     """
     メイン関数です。コマンドライン引数を解析し、適切な処理を実行します。
@@ -322,10 +723,17 @@ def main() -> None:
     Returns:
         None
     """
-    parser = argparse.ArgumentParser(description="本棚管理システム")
-    setup_subparsers(parser)
-
-    args = parser.parse_args()
+    # よく使う形の引数は argparse のパーサーを構築せずに解析し、起動を速くする
+    parser: Optional[argparse.ArgumentParser] = None
+    args = parse_args_fast(sys.argv[1:])
+    if args is None:
+        # ヘルプ表示や引数エラーなど、高速パスで扱えない場合は argparse に任せる
+        # (注釈で使う TYPE_CHECKING 用の名前と区別するため別名でインポートする)
+        import argparse as _argparse
+
+        parser = _argparse.ArgumentParser(description="本棚管理システム")
+        setup_subparsers(parser)
+        args = parser.parse_args()
 
     # シェルフディレクトリを準備
     setup_shelf()
@@ -344,9 +752,11 @@ def main() -> None:
             handle_list()
         elif args.func == "info":
             handle_info(args.id)
-    else:
+    elif parser is not None:
         parser.print_help()
 
 
 if __name__ == "__main__":
+    # PyInstallerでビルドした実行ファイルでもプロセスプールを使えるようにする
+    multiprocessing.freeze_support()
     main()
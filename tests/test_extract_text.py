@@ -6,7 +6,14 @@ from pathlib import Path
 # 注意: 以下のimportが成功するには、プロジェクトのルートディレクトリからpytestを実行するか、
 # PYTHONPATHにsrcディレクトリが含まれている必要があります。
 # (現在のpytestの実行方法では問題ないはずです)
-from extract_text import extract_text_from_pdf, extract_text_from_epub
+import pytest
+
+from extract_text import (
+    extract_text,
+    extract_text_from_pdf,
+    extract_text_from_epub,
+    extract_text_to,
+)
 
 # --- Pytest Fixtures ---
 
@@ -21,3 +28,90 @@ def test_extract_text_from_epub():
     path = Path("tests/files/test.epub")
     txt = extract_text_from_epub(path)
     assert txt is not None
+
+
+def test_extract_text_from_pdf_parallel(tmp_path, monkeypatch):
+    """並列抽出の対象となるページ数のPDFでもページ順にテキストが抽出されることを確認"""
+    import fitz
+    import extract_text
+
+    # 小さなPDFかつ単一コアの環境でも並列処理の経路を通るようにする
+    monkeypatch.setattr(extract_text, "PDF_PAGES_PER_WORKER", 10)
+    monkeypatch.setattr(extract_text.os, "cpu_count", lambda: 4)
+
+    written = []
+    original = extract_text._write_pdf_parallel
+
+    def spy_write(path, page_count, processes, out):
+        written.append(processes)
+        original(path, page_count, processes, out)
+
+    monkeypatch.setattr(extract_text, "_write_pdf_parallel", spy_write)
+
+    path = tmp_path / "many_pages.pdf"
+    page_count = 35
+    with fitz.open() as doc:
+        for i in range(page_count):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"page {i}")
+        doc.save(path)
+
+    txt = extract_text_from_pdf(path)
+    assert txt is not None
+    assert txt.split() == [w for i in range(page_count) for w in ("page", str(i))]
+    # ワーカー数はCPU数ではなく、1ワーカーあたりのページ数で制限される
+    assert written == [3]
+
+
+@pytest.mark.parametrize(
+    "path", ["tests/files/test.pdf", "tests/files/test.epub", "tests/files/test.txt"]
+)
+def test_extract_text_to(tmp_path, path):
+    """ファイルへ書き出したテキストが extract_text の結果と一致することを確認"""
+    out_path = tmp_path / "out.txt"
+    assert extract_text_to(Path(path), out_path)
+    assert out_path.read_text(encoding="utf-8") == extract_text(Path(path))
+
+
+@pytest.mark.parametrize("name", ["missing.pdf", "missing.epub", "missing.txt"])
+def test_extract_text_missing_file(tmp_path, caplog, name):
+    """存在しないファイルではスタックトレースなしでエラーが記録されることを確認"""
+    assert extract_text(tmp_path / name) is None
+    errors = [r for r in caplog.records if r.levelname == "ERROR"]
+    assert errors
+    assert all(r.exc_info is None for r in errors)
+
+
+def test_extract_text_invalid_utf8_txt(tmp_path, caplog):
+    """UTF-8でないテキストファイルは保存されず、エラーが記録されることを確認"""
+    path = tmp_path / "sjis.txt"
+    path.write_bytes("日本語のテキスト".encode("shift_jis"))
+    out_path = tmp_path / "out.txt"
+
+    assert extract_text(path) is None
+    assert not extract_text_to(path, out_path)
+    assert not out_path.exists()
+    errors = [r for r in caplog.records if r.levelname == "ERROR"]
+    assert errors
+    assert all(r.exc_info is None for r in errors)
+
+
+def test_extract_text_from_epub_backends(monkeypatch):
+    """selectolax と BeautifulSoup のどちらでも同じ単語列が抽出されることを確認"""
+    import extract_text
+
+    pytest.importorskip("selectolax.lexbor")
+    texts = []
+    for html_to_text in (
+        extract_text._html_body_to_text_selectolax,
+        extract_text._html_body_to_text_bs4,
+    ):
+        monkeypatch.setattr(extract_text, "_get_html_to_text", lambda f=html_to_text: f)
+        txt = extract_text_from_epub(Path("tests/files/test.epub"))
+        assert txt is not None
+        texts.append(txt)
+
+    # 空白の扱いはバックエンドごとに異なるため、単語列で比較する
+    selectolax_text, bs4_text = texts
+    assert selectolax_text.split() == bs4_text.split()
+    assert selectolax_text.split()[0] == "test"